@@ -1,7 +1,11 @@
+import logging
 import pendulum
 from airflow.sdk import dag, task
 
 
+logger = logging.getLogger(__name__)
+
+
 @dag(
     dag_id="basic_data_pipeline",
     schedule=None,
@@ -20,134 +24,72 @@ def basic_data_pipeline():
     Basic data pipeline DAG with extract, transform, and load operations.
     """
 
-    @task
-    def start_pipeline():
-        """
-        Initialize pipeline execution and log start time.
+    @task(multiple_outputs=False)
+    def run_pipeline():
         """
-        try:
-            start_time = pendulum.now("UTC")
-            print(f"Pipeline started at: {start_time.to_iso8601_string()}")
-            
-            pipeline_info = {
-                "start_time": start_time.to_iso8601_string(),
-                "status": "initialized",
-                "pipeline_id": "basic_data_pipeline"
-            }
-            
-            return pipeline_info
-        except Exception as e:
-            print(f"Error initializing pipeline: {str(e)}")
-            raise
+        Run extract, transform and load in a single task.
 
-    @task
-    def extract_data(pipeline_info: dict):
-        """
-        Extract data from source.
+        The stages are cheap in-process steps, so they share one worker
+        instead of handing their records to each other through XCom.
         """
         try:
-            print("Extracting data from source...")
-            
-            # Simulate data extraction
-            extracted_data = {
-                "pipeline_id": pipeline_info["pipeline_id"],
-                "extraction_time": pendulum.now("UTC").to_iso8601_string(),
-                "records": [
-                    {"id": 1, "value": 100},
-                    {"id": 2, "value": 200},
-                    {"id": 3, "value": 300},
-                ]
-            }
-            
-            print(f"Successfully extracted {len(extracted_data['records'])} records")
-            return extracted_data
-        except Exception as e:
-            print(f"Error during extraction: {str(e)}")
-            raise
+            # Start
+            start_time = pendulum.now("UTC").to_iso8601_string()
+            logger.info("Pipeline started at: %s", start_time)
 
-    @task
-    def transform_data(extracted_data: dict):
-        """
-        Transform extracted data.
-        """
-        try:
-            print("Transforming data...")
-            
-            records = extracted_data.get("records", [])
-            
-            # Apply transformation
-            transformed_records = [
-                {**record, "transformed_value": record["value"] * 2}
-                for record in records
+            pipeline_id = "basic_data_pipeline"
+
+            # Extract
+            logger.info("Extracting data from source...")
+
+            # Simulate data extraction
+            records = [
+                {"id": 1, "value": 100},
+                {"id": 2, "value": 200},
+                {"id": 3, "value": 300},
             ]
-            
-            transformed_data = {
-                "pipeline_id": extracted_data["pipeline_id"],
-                "transformation_time": pendulum.now("UTC").to_iso8601_string(),
-                "records": transformed_records,
-                "total": sum(r["transformed_value"] for r in transformed_records)
-            }
-            
-            print(f"Transformed {len(transformed_records)} records")
-            return transformed_data
-        except Exception as e:
-            print(f"Error during transformation: {str(e)}")
-            raise
 
-    @task
-    def load_data(transformed_data: dict):
-        """
-        Load transformed data to destination.
-        """
-        try:
-            print("Loading data to destination...")
-            
-            record_count = len(transformed_data.get("records", []))
-            
-            load_result = {
-                "pipeline_id": transformed_data["pipeline_id"],
-                "load_time": pendulum.now("UTC").to_iso8601_string(),
-                "records_loaded": record_count,
-                "total_value": transformed_data.get("total", 0),
-                "status": "success"
-            }
-            
-            print(f"Successfully loaded {record_count} records")
-            return load_result
-        except Exception as e:
-            print(f"Error during load: {str(e)}")
-            raise
+            logger.info("Successfully extracted %s records", len(records))
+
+            # Transform
+            logger.info("Transforming data...")
+
+            # Records are only used here, so transform them in place
+            total = 0
+            for record in records:
+                record["transformed_value"] = record["value"] * 2
+                total += record["transformed_value"]
+
+            logger.info("Transformed %s records", len(records))
+
+            # Load
+            logger.info("Loading data to destination...")
+
+            record_count = len(records)
+
+            logger.info("Successfully loaded %s records", record_count)
+
+            # Complete
+            end_time = pendulum.now("UTC").to_iso8601_string()
 
-    @task
-    def complete_pipeline(load_result: dict):
-        """
-        Complete pipeline execution and log summary.
-        """
-        try:
-            end_time = pendulum.now("UTC")
-            
             summary = {
-                "pipeline_id": load_result["pipeline_id"],
-                "end_time": end_time.to_iso8601_string(),
-                "records_processed": load_result["records_loaded"],
-                "total_value": load_result["total_value"],
+                "pipeline_id": pipeline_id,
+                "start_time": start_time,
+                "end_time": end_time,
+                "records_processed": record_count,
+                "total_value": total,
                 "status": "completed"
             }
-            
-            print(f"Pipeline completed at: {summary['end_time']}")
-            print(f"Total records processed: {summary['records_processed']}")
-            
+
+            logger.info("Pipeline completed at: %s", summary['end_time'])
+            logger.info("Total records processed: %s", summary['records_processed'])
+
             return summary
         except Exception as e:
-            print(f"Error completing pipeline: {str(e)}")
+            logger.error("Error running pipeline: %s", e)
             raise
 
-    # Define task dependencies
-    pipeline_start = start_pipeline()
-    extracted = extract_data(pipeline_start)
-    transformed = transform_data(extracted)
-    loaded = load_data(transformed)
-    completed = complete_pipeline(loaded)
+    run_pipeline()
 
 
 # Instantiate the DAG
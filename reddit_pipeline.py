@@ -1,10 +1,92 @@
+import logging
+import os
+from datetime import datetime, timezone
 import pendulum
 from airflow.sdk import dag, task
 import praw
-import json
+import orjson
+import numpy as np
 from typing import List, Dict
 
 
+logger = logging.getLogger(__name__)
+
+# Posts are handed between tasks through files in this directory; only the
+# file path and small summary values travel through XCom.
+DATA_DIR = os.getenv("REDDIT_DATA_DIR", "/tmp/reddit_pipeline")
+
+# Subreddits to extract; each one flows through the pipeline as its own
+# mapped task instance.
+SUBREDDITS = ["python", "dataengineering", "airflow"]
+
+# Airflow pool that caps concurrent Reddit API calls. Create it before the
+# first run, sized to the API rate limit, e.g.:
+#   airflow pools set reddit_api_pool 4 "Reddit API calls"
+REDDIT_API_POOL = "reddit_api_pool"
+
+# Execution report emitted by generate_report, filled from a load summary
+# merged with its statistics.
+_REPORT_TEMPLATE = """
+            ╔══════════════════════════════════════════════════════════╗
+            ║           Reddit Data Pipeline - Execution Report        ║
+            ╚══════════════════════════════════════════════════════════╝
+            
+            Subreddit: r/{subreddit}
+            Execution Time: {load_time}
+            Status: {status}
+            
+            📊 STATISTICS
+            ─────────────────────────────────────────────────────────
+            Total Posts Processed: {total_posts}
+            Text Posts: {text_posts}
+            Link Posts: {link_posts}
+            
+            Average Score: {avg_score:.2f}
+            Average Comments: {avg_comments:.2f}
+            Average Engagement Score: {avg_engagement:.2f}
+            
+            Output File: {output_file}
+            ─────────────────────────────────────────────────────────
+            """
+
+
+def _write_posts(filename: str, posts: List[Dict]) -> str:
+    """
+    Write posts to a JSON file under DATA_DIR and return its path.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, filename)
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(posts))
+    return path
+
+
+def _read_posts(path: str) -> List[Dict]:
+    """
+    Read posts previously written by _write_posts.
+    """
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+_reddit = None
+
+
+def _get_reddit() -> praw.Reddit:
+    """
+    Return the Reddit API client for this worker process, creating it on
+    first use so its session and connection pool are reused across runs.
+    """
+    global _reddit
+    if _reddit is None:
+        _reddit = praw.Reddit(
+            client_id=os.getenv("REDDIT_CLIENT_ID", "your_client_id"),
+            client_secret=os.getenv("REDDIT_CLIENT_SECRET", "your_client_secret"),
+            user_agent=os.getenv("REDDIT_USER_AGENT", "airflow:reddit_pipeline:v1.0.0")
+        )
+    return _reddit
+
+
 @dag(
     dag_id="reddit_data_pipeline",
     schedule="@daily",
@@ -24,7 +106,7 @@ def reddit_data_pipeline():
     processes the data, and prepares it for storage or further analysis.
     """
 
-    @task
+    @task(pool=REDDIT_API_POOL, multiple_outputs=False)
     def extract_reddit_posts(subreddit_name: str = "python", limit: int = 100):
         """
         Extract posts from a specified subreddit using PRAW.
@@ -35,127 +117,146 @@ def reddit_data_pipeline():
         - REDDIT_CLIENT_SECRET
         - REDDIT_USER_AGENT
         """
-        import os
-        
         try:
-            print(f"Extracting posts from r/{subreddit_name}...")
-            
-            # Initialize Reddit API client
-            reddit = praw.Reddit(
-                client_id=os.getenv("REDDIT_CLIENT_ID", "your_client_id"),
-                client_secret=os.getenv("REDDIT_CLIENT_SECRET", "your_client_secret"),
-                user_agent=os.getenv("REDDIT_USER_AGENT", "airflow:reddit_pipeline:v1.0.0")
-            )
+            logger.info("Extracting posts from r/%s...", subreddit_name)
             
             # Fetch posts from subreddit
-            subreddit = reddit.subreddit(subreddit_name)
+            subreddit = _get_reddit().subreddit(subreddit_name)
             posts = []
             
+            # The listing is paged (up to 100 posts per request) and each post
+            # arrives with its attributes loaded, so this loop makes
+            # ceil(limit / 100) API calls rather than one per post
             for post in subreddit.hot(limit=limit):
+                author = post.author
+                selftext = post.selftext
                 post_data = {
                     "id": post.id,
                     "title": post.title,
-                    "author": str(post.author) if post.author else "[deleted]",
+                    "author": str(author) if author else "[deleted]",
                     "score": post.score,
                     "upvote_ratio": post.upvote_ratio,
                     "num_comments": post.num_comments,
                     "created_utc": post.created_utc,
                     "url": post.url,
-                    "selftext": post.selftext[:500] if post.selftext else "",  # Limit text length
+                    "selftext": selftext[:500] if selftext else "",  # Limit text length
                     "subreddit": subreddit_name,
                     "is_self": post.is_self,
                     "link_flair_text": post.link_flair_text,
                 }
                 posts.append(post_data)
             
-            print(f"Successfully extracted {len(posts)} posts from r/{subreddit_name}")
+            logger.info("Successfully extracted %s posts from r/%s", len(posts), subreddit_name)
+            
+            extraction_time = pendulum.now("UTC")
+            posts_path = _write_posts(
+                f"reddit_{subreddit_name}_{extraction_time.format('YYYYMMDDTHHmmss')}_raw.json",
+                posts,
+            )
             
             return {
                 "subreddit": subreddit_name,
-                "extraction_time": pendulum.now("UTC").to_iso8601_string(),
-                "posts": posts,
+                "extraction_time": extraction_time.to_iso8601_string(),
+                "posts_path": posts_path,
                 "total_posts": len(posts)
             }
             
         except Exception as e:
-            print(f"Error extracting Reddit posts: {str(e)}")
+            logger.error("Error extracting Reddit posts: %s", e)
             raise
 
-    @task
+    @task(multiple_outputs=False)
     def transform_reddit_data(raw_data: Dict):
         """
         Transform and enrich the extracted Reddit data.
         """
         try:
-            print("Transforming Reddit data...")
+            logger.info("Transforming Reddit data...")
+            
+            posts = _read_posts(raw_data["posts_path"])
+            count = len(posts)
+            
+            # Pull the numeric columns into arrays so engagement and the
+            # statistics below are computed in vectorized passes
+            scores = np.fromiter((p["score"] for p in posts), dtype=np.int64, count=count)
+            num_comments = np.fromiter((p["num_comments"] for p in posts), dtype=np.int64, count=count)
+            upvote_ratios = np.fromiter((p["upvote_ratio"] for p in posts), dtype=np.float64, count=count)
+            selftext_lens = np.fromiter((len(p["selftext"]) for p in posts), dtype=np.int32, count=count)
+            title_lens = np.fromiter((len(p["title"]) for p in posts), dtype=np.int32, count=count)
+            has_text = selftext_lens > 0
+            
+            # Calculate engagement score
+            engagement = np.round(scores * 0.5 + num_comments * 2 + upvote_ratios * 100, 2)
+            
+            # Sort by engagement score
+            order = np.argsort(-engagement, kind="stable")
             
-            posts = raw_data.get("posts", [])
             transformed_posts = []
+            transformation_time = pendulum.now("UTC")
             
-            for post in posts:
-                # Calculate engagement score
-                engagement_score = (
-                    post["score"] * 0.5 +
-                    post["num_comments"] * 2 +
-                    post["upvote_ratio"] * 100
-                )
+            for i in order:
+                post = posts[i]
                 
                 # Convert timestamp to readable date
-                created_date = pendulum.from_timestamp(post["created_utc"], tz="UTC")
+                created_date = datetime.fromtimestamp(post["created_utc"], tz=timezone.utc)
                 
-                transformed_post = {
-                    **post,
-                    "engagement_score": round(engagement_score, 2),
-                    "created_date": created_date.to_iso8601_string(),
-                    "created_date_formatted": created_date.format("YYYY-MM-DD HH:mm:ss"),
-                    "has_text": len(post["selftext"]) > 0,
-                    "title_length": len(post["title"]),
-                    "age_hours": (pendulum.now("UTC") - created_date).in_hours()
-                }
+                # Posts are not reused after this loop, so enrich them in place
+                post["engagement_score"] = float(engagement[i])
+                post["created_date"] = created_date.isoformat()
+                post["created_date_formatted"] = created_date.strftime("%Y-%m-%d %H:%M:%S")
+                post["has_text"] = bool(has_text[i])
+                post["title_length"] = int(title_lens[i])
+                post["age_hours"] = int((transformation_time - created_date).total_seconds() // 3600)
                 
-                transformed_posts.append(transformed_post)
-            
-            # Sort by engagement score
-            transformed_posts.sort(key=lambda x: x["engagement_score"], reverse=True)
+                transformed_posts.append(post)
             
             # Calculate statistics
+            text_posts = int(has_text.sum())
             stats = {
-                "total_posts": len(transformed_posts),
-                "avg_score": sum(p["score"] for p in transformed_posts) / len(transformed_posts) if transformed_posts else 0,
-                "avg_comments": sum(p["num_comments"] for p in transformed_posts) / len(transformed_posts) if transformed_posts else 0,
-                "avg_engagement": sum(p["engagement_score"] for p in transformed_posts) / len(transformed_posts) if transformed_posts else 0,
-                "text_posts": sum(1 for p in transformed_posts if p["has_text"]),
-                "link_posts": sum(1 for p in transformed_posts if not p["has_text"])
+                "total_posts": count,
+                "avg_score": float(scores.mean()) if count else 0,
+                "avg_comments": float(num_comments.mean()) if count else 0,
+                "avg_engagement": float(engagement.mean()) if count else 0,
+                "text_posts": text_posts,
+                "link_posts": count - text_posts
             }
             
+            posts_path = _write_posts(
+                f"reddit_{raw_data['subreddit']}_{transformation_time.format('YYYYMMDDTHHmmss')}.json",
+                transformed_posts,
+            )
+            
             result = {
                 "subreddit": raw_data["subreddit"],
                 "extraction_time": raw_data["extraction_time"],
-                "transformation_time": pendulum.now("UTC").to_iso8601_string(),
-                "posts": transformed_posts,
+                "transformation_time": transformation_time.to_iso8601_string(),
+                "posts_path": posts_path,
+                "total_posts": len(transformed_posts),
                 "statistics": stats
             }
             
-            print(f"Transformed {len(transformed_posts)} posts")
-            print(f"Statistics: {json.dumps(stats, indent=2)}")
+            logger.info("Transformed %s posts", len(transformed_posts))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Statistics: %s", orjson.dumps(stats, option=orjson.OPT_INDENT_2).decode())
             
             return result
             
         except Exception as e:
-            print(f"Error transforming Reddit data: {str(e)}")
+            logger.error("Error transforming Reddit data: %s", e)
             raise
 
-    @task
+    @task(multiple_outputs=False)
     def load_reddit_data(transformed_data: Dict):
         """
         Load the transformed Reddit data to a destination.
         This is a placeholder - adapt to your storage solution (S3, database, etc.)
         """
         try:
-            print("Loading Reddit data...")
+            logger.info("Loading Reddit data...")
             
-            # Example: Save to JSON file (in production, use proper storage)
-            output_filename = f"reddit_{transformed_data['subreddit']}_{pendulum.now('UTC').format('YYYY-MM-DD')}.json"
+            # The transformed posts are already on disk; in production,
+            # upload this file rather than passing the posts around.
+            output_filename = transformed_data["posts_path"]
             
             # In a real scenario, you would:
             # - Save to S3/GCS
@@ -165,23 +266,23 @@ def reddit_data_pipeline():
             
             load_summary = {
                 "subreddit": transformed_data["subreddit"],
-                "posts_loaded": len(transformed_data["posts"]),
+                "posts_loaded": transformed_data["total_posts"],
                 "load_time": pendulum.now("UTC").to_iso8601_string(),
                 "output_file": output_filename,
                 "statistics": transformed_data["statistics"],
                 "status": "success"
             }
             
-            print(f"Successfully prepared {load_summary['posts_loaded']} posts for loading")
-            print(f"Output file: {output_filename}")
+            logger.info("Successfully prepared %s posts for loading", load_summary['posts_loaded'])
+            logger.info("Output file: %s", output_filename)
             
             return load_summary
             
         except Exception as e:
-            print(f"Error loading Reddit data: {str(e)}")
+            logger.error("Error loading Reddit data: %s", e)
             raise
 
-    @task
+    @task(multiple_outputs=False)
     def generate_report(load_summary: Dict):
         """
         Generate a summary report of the pipeline execution.
@@ -189,30 +290,9 @@ def reddit_data_pipeline():
         try:
             stats = load_summary["statistics"]
             
-            report = f"""
-            ╔══════════════════════════════════════════════════════════╗
-            ║           Reddit Data Pipeline - Execution Report        ║
-            ╚══════════════════════════════════════════════════════════╝
-            
-            Subreddit: r/{load_summary['subreddit']}
-            Execution Time: {load_summary['load_time']}
-            Status: {load_summary['status']}
-            
-            📊 STATISTICS
-            ─────────────────────────────────────────────────────────
-            Total Posts Processed: {stats['total_posts']}
-            Text Posts: {stats['text_posts']}
-            Link Posts: {stats['link_posts']}
-            
-            Average Score: {stats['avg_score']:.2f}
-            Average Comments: {stats['avg_comments']:.2f}
-            Average Engagement Score: {stats['avg_engagement']:.2f}
-            
-            Output File: {load_summary['output_file']}
-            ─────────────────────────────────────────────────────────
-            """
+            report = _REPORT_TEMPLATE.format_map({**load_summary, **stats})
             
-            print(report)
+            logger.info("%s", report)
             
             return {
                 "report": report,
@@ -221,14 +301,51 @@ def reddit_data_pipeline():
             }
             
         except Exception as e:
-            print(f"Error generating report: {str(e)}")
+            logger.error("Error generating report: %s", e)
+            raise
+
+    @task(multiple_outputs=False)
+    def summarize_subreddits(load_summaries: List[Dict]):
+        """
+        Combine the per-subreddit load summaries into a single overview.
+        """
+        try:
+            load_summaries = list(load_summaries)
+            total_posts = sum(s["posts_loaded"] for s in load_summaries)
+            
+            def weighted_avg(key: str) -> float:
+                if not total_posts:
+                    return 0
+                return sum(
+                    s["statistics"][key] * s["posts_loaded"] for s in load_summaries
+                ) / total_posts
+            
+            summary = {
+                "subreddits": [s["subreddit"] for s in load_summaries],
+                "total_posts": total_posts,
+                "avg_score": weighted_avg("avg_score"),
+                "avg_comments": weighted_avg("avg_comments"),
+                "avg_engagement": weighted_avg("avg_engagement"),
+                "text_posts": sum(s["statistics"]["text_posts"] for s in load_summaries),
+                "link_posts": sum(s["statistics"]["link_posts"] for s in load_summaries),
+                "output_files": [s["output_file"] for s in load_summaries],
+                "status": "completed"
+            }
+            
+            logger.info("Processed %s posts across %s subreddits", total_posts, len(load_summaries))
+            
+            return summary
+            
+        except Exception as e:
+            logger.error("Error summarizing subreddits: %s", e)
             raise
 
     # Define task dependencies
-    reddit_data = extract_reddit_posts(subreddit_name="python", limit=100)
-    transformed = transform_reddit_data(reddit_data)
-    loaded = load_reddit_data(transformed)
-    report = generate_report(loaded)
+    reddit_data = extract_reddit_posts.partial(limit=100).expand(subreddit_name=SUBREDDITS)
+    transformed = transform_reddit_data.expand(raw_data=reddit_data)
+    loaded = load_reddit_data.expand(transformed_data=transformed)
+    report = generate_report.expand(load_summary=loaded)
+    summary = summarize_subreddits(loaded)
 
 
 # Instantiate the DAG